@@ -49,7 +49,7 @@ def test_class_instantiation():
 
 def test_dependencies():
     """Test that all required dependencies are available"""
-    required_modules = ['pandas', 'numpy', 'alpaca_trade_api', 'dotenv']
+    required_modules = ['pandas', 'numpy', 'numba', 'orjson', 'alpaca_trade_api', 'dotenv']
     success = True
     
     for module in required_modules:
@@ -62,6 +62,159 @@ def test_dependencies():
     
     return success
 
+def test_signal_calculation():
+    """Test that the compiled signal kernel matches the pandas crossover calculation"""
+    try:
+        import numpy as np
+        import pandas as pd
+        from trading_bot import _signal_kernel, MA_TIE_TOLERANCE
+        
+        _compute_signals = _signal_kernel()
+        
+        short_window, long_window = 5, 20
+        rng = np.random.default_rng(0)
+        series = {
+            # Gaussian walks never produce exact MA ties...
+            'random walk': lambda size: 150 + np.cumsum(rng.normal(0, 1, size=size)),
+            # ...but flat runs and cent-quantized walks of a cheap stock often do
+            'flat series': lambda size: np.full(size, 101.37),
+            'cent walk': lambda size: np.round(7 + np.cumsum(rng.choice([-0.01, 0.0, 0.01], size=size)), 2),
+        }
+        for kind, make_closes in series.items():
+            for size in (long_window, long_window + 1, 500):
+                for _ in range(50):
+                    # The bot rounds closes to float32 when it fetches them
+                    closes = make_closes(size).astype(np.float32).astype(np.float64)
+                    
+                    data = pd.DataFrame({'close': closes})
+                    short_ma = data['close'].rolling(window=short_window).mean()
+                    long_ma = data['close'].rolling(window=long_window).mean()
+                    data['signal'] = 0
+                    # MAs equal up to float rounding are a tie, i.e. "not above"
+                    above = short_ma.iloc[short_window:] - long_ma.iloc[short_window:] > (
+                        MA_TIE_TOLERANCE * long_ma.iloc[short_window:]
+                    )
+                    data.iloc[short_window:, data.columns.get_loc('signal')] = np.where(above, 1, -1)
+                    position = data['signal'].diff()
+                    expected = (data['signal'].iloc[-1], position.iloc[-1], closes[-1])
+                    
+                    result = _compute_signals(closes, short_window, long_window)
+                    if result[:3] != expected or not np.allclose(
+                        result[3:], (short_ma.iloc[-1], long_ma.iloc[-1])
+                    ):
+                        print(f"❌ Signal mismatch for {size} bars of {kind}")
+                        return False
+        
+        # A flat series is an exact tie in pandas too: sell signal, no change
+        if _compute_signals(np.full(40, 101.37), short_window, long_window)[:2] != (-1, 0):
+            print("❌ Flat series did not resolve as a tie")
+            return False
+        
+        print("✅ Signal kernel matches pandas crossover calculation")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to calculate signals: {e}")
+        return False
+
+def test_incremental_signals():
+    """Test that the incremental MA state matches the signal kernel bar by bar"""
+    try:
+        import types
+        import numpy as np
+        import pandas as pd
+        from datetime import datetime, timedelta, timezone
+        from trading_bot import SimpleMovingAverageBot, _signal_kernel, _parse_bar_time
+        
+        _compute_signals = _signal_kernel()
+        
+        # Build the bot without __init__ so no API connection is made
+        symbols = ['AAA', 'BBB']
+        bot = SimpleMovingAverageBot.__new__(SimpleMovingAverageBot)
+        bot.symbols = symbols
+        bot.short_window, bot.long_window = 5, 20
+        bot._closes = np.zeros((len(symbols), bot.long_window), dtype=np.float32)
+        bot._state = {symbol: bot._new_state(row) for row, symbol in enumerate(symbols)}
+        
+        # Closes are stored as float32, so compare against the kernel run on
+        # the same rounded values; interleave symbols to share the ring array
+        rng = np.random.default_rng(1)
+        walks = {
+            symbol: (150 + np.cumsum(rng.normal(0, 1, size=2000))).astype(np.float32).astype(np.float64)
+            for symbol in symbols
+        }
+        for i in range(2000):
+            for symbol in symbols:
+                result = bot._push_close(bot._state[symbol], walks[symbol][i])
+                if i < bot.long_window:
+                    if result is not None:
+                        print(f"❌ Signal reported during warm-up at bar {i + 1}")
+                        return False
+                    continue
+                expected = _compute_signals(walks[symbol][:i + 1], 5, 20)
+                if result[:2] != expected[:2] or not np.allclose(result[2:], expected[3:]):
+                    print(f"❌ Incremental signal mismatch for {symbol} at bar {i + 1}")
+                    return False
+        
+        # A crossover early in a batch must survive later bars in the batch
+        state = bot._state['AAA']
+        bot._seed_state(state, np.full(21, 100.0), None)
+        result = bot._push_closes(state, [101.0, 102.0, 103.0])
+        if result[:2] != (1, 2):
+            print(f"❌ Crossover inside a batch was lost: {result[:2]}")
+            return False
+        
+        # Minute bars and snapshots served from one fixed series, with
+        # timestamps in Alpaca's 'Z' format
+        start = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+        series = walks['BBB'][:1200]
+        bars = [
+            {'t': (start + timedelta(minutes=i)).strftime('%Y-%m-%dT%H:%M:%SZ'), 'c': close}
+            for i, close in enumerate(series)
+        ]
+        visible = [0]
+        
+        def get_bars_iter(symbol, timeframe, start, end, limit, raw):
+            after = _parse_bar_time(start)
+            return iter([bar for bar in bars[:visible[0]] if _parse_bar_time(bar['t']) >= after][:limit])
+        
+        def snapshot(i):
+            bar = types.SimpleNamespace(t=pd.Timestamp(bars[i]['t']), c=bars[i]['c'])
+            return types.SimpleNamespace(minute_bar=bar, latest_trade=types.SimpleNamespace(p=bars[i]['c']))
+        
+        bot.api = types.SimpleNamespace(get_bars_iter=get_bars_iter)
+        state = bot._state['BBB']
+        bot._seed_state(state, series[:100], _parse_bar_time(bars[99]['t']))
+        
+        # Several new bars per tick (and a gap larger than one page) through
+        # get_tick_signals, then single bars through snapshots
+        for end, use_snapshot in ((103, False), (1150, False), (1151, True), (1152, True)):
+            previous = _compute_signals(series[:visible[0] or 100], 5, 20)[0]
+            visible[0] = end
+            if use_snapshot:
+                tick = bot._tick_from_snapshot('BBB', snapshot(end - 1))
+            else:
+                tick = bot.get_tick_signals('BBB')
+            expected = _compute_signals(series[:end], 5, 20)
+            if tick[:2] != (expected[0], expected[0] - previous):
+                print(f"❌ Tick signal mismatch after {end} bars: {tick[:2]}")
+                return False
+        
+        # A snapshot after missed bars falls back to fetching all of them
+        visible[0] = 1160
+        tick = bot._tick_from_snapshot('BBB', snapshot(1159))
+        if (state['last_bar_time'] != _parse_bar_time(bars[1159]['t'])
+                or tick[0] != _compute_signals(series[:1160], 5, 20)[0]):
+            print("❌ Snapshot after a bar gap did not catch up")
+            return False
+        
+        print("✅ Incremental signals match the signal kernel")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Failed to calculate incremental signals: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("Running trading bot tests...")
@@ -71,6 +224,8 @@ def main():
         ("Dependencies", test_dependencies),
         ("Import", test_import),
         ("Class Instantiation", test_class_instantiation),
+        ("Signal Calculation", test_signal_calculation),
+        ("Incremental Signals", test_incremental_signals),
     ]
     
     results = []
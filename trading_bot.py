@@ -5,28 +5,122 @@ Implements a Moving Average Crossover Strategy
 """
 
 import os
+import time
+import asyncio
+import argparse
+import atexit
+import queue
 import logging
-import pandas as pd
-import numpy as np
 import pytz
-from datetime import datetime, timedelta
-from alpaca_trade_api import REST, TimeFrame
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
+# numpy, numba and alpaca_trade_api (which pulls in pandas and aiohttp) are
+# imported where they are used, so importing this module stays cheap
+
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging. Records are formatted by the QueueHandler and written by
+# a background listener thread, so file I/O never blocks strategy execution.
+log_queue = queue.SimpleQueue()
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_bot.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(log_queue)]
+)
+log_listener = QueueListener(
+    log_queue,
+    logging.FileHandler('trading_bot.log'),
+    logging.StreamHandler()
 )
+log_listener.start()
+atexit.register(log_listener.stop)  # Flush queued records on exit
 logger = logging.getLogger(__name__)
 
+# How long slow-changing API responses are reused before being refetched.
+# Positions and account are also invalidated whenever we place an order.
+CLOCK_CACHE_SECONDS = 30
+POSITION_CACHE_SECONDS = 30
+ACCOUNT_CACHE_SECONDS = 60
+
+# Compiled numba kernels are cached here so later processes skip compilation
+NUMBA_CACHE_DIR = '.numba_cache'
+
+# Historical fallback closes cover a fixed range in the past, so they are kept
+# on disk (keyed by symbol, timeframe and date range) between runs
+BARS_CACHE_DIR = '.bars_cache'
+BARS_CACHE_SECONDS = 24 * 60 * 60
+
+# Moving averages closer than this (relative to the long MA) count as equal, so
+# ties broken only by float rounding read as "not above", like the DataFrame
+# version on a flat series. It sits above float32 rounding error and below the
+# smallest real gap between 5- and 20-bar MAs of cent-quoted prices up to about
+# $1,500.
+MA_TIE_TOLERANCE = 2e-7
+
+def _orjson_response_hook(response, *args, **kwargs):
+    """Session response hook that decodes JSON bodies with orjson"""
+    import orjson
+    response.json = lambda **json_kwargs: orjson.loads(response.content)
+    return response
+
+def _parse_bar_time(timestamp):
+    """Parse an RFC 3339 bar timestamp; fromisoformat only accepts 'Z' from 3.11"""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+def _compute_signals(closes, short_window, long_window):
+    """
+    Moving average crossover kernel.
+    
+    Only the latest signal and its change from the previous bar are needed, so
+    just the last long_window + 1 closes are read: O(window), not O(len(closes)).
+    Returns (signal, position change, price, short MA, long MA) for the latest
+    bar. Signals follow the DataFrame version: 0 before short_window bars, -1
+    while the long MA is still undefined, then 1 when short MA > long MA (by
+    more than MA_TIE_TOLERANCE), else -1. Expects len(closes) >= long_window >
+    short_window.
+    """
+    n = closes.shape[0]
+    
+    short_sum = 0.0
+    for i in range(n - short_window, n):
+        short_sum += closes[i]
+    long_sum = 0.0
+    for i in range(n - long_window, n):
+        long_sum += closes[i]
+    short_ma = short_sum / short_window
+    long_ma = long_sum / long_window
+    
+    # Branchless comparison -> {-1, 1}, on the sums scaled to a common
+    # denominator so a tie within the tolerance is "not above"
+    tolerance = MA_TIE_TOLERANCE * short_window
+    curr_signal = 2 * int(short_sum * long_window - long_sum * short_window > tolerance * long_sum) - 1
+    
+    # The previous bar's windows differ by one close at each end
+    prev = n - 2
+    if prev < short_window:
+        prev_signal = 0
+    elif prev < long_window - 1:
+        prev_signal = -1
+    else:
+        prev_short_sum = short_sum - closes[n - 1] + closes[n - 1 - short_window]
+        prev_long_sum = long_sum - closes[n - 1] + closes[n - 1 - long_window]
+        prev_signal = 2 * int(
+            prev_short_sum * long_window - prev_long_sum * short_window > tolerance * prev_long_sum
+        ) - 1
+    
+    return curr_signal, curr_signal - prev_signal, closes[n - 1], short_ma, long_ma
+
+@lru_cache(maxsize=None)
+def _signal_kernel():
+    """Compiled _compute_signals; numba is only imported on first use"""
+    os.environ.setdefault('NUMBA_CACHE_DIR', NUMBA_CACHE_DIR)  # Read by numba on import
+    from numba import njit
+    return njit('Tuple((i8, i8, f8, f8, f8))(f8[:], i8, i8)', cache=True, fastmath=True)(_compute_signals)
+
 class SimpleMovingAverageBot:
     """
     A simple day trading bot that uses moving average crossover strategy.
@@ -38,7 +132,21 @@ class SimpleMovingAverageBot:
     - Uses paper trading only for safety
     """
     
-    def __init__(self):
+    def __init__(self, symbols=None):
+        import numpy as np
+        from alpaca_trade_api import REST
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        # Trading parameters
+        # Each symbol is traded independently. Upper-case and de-duplicate them:
+        # a repeated symbol would get two rows of state and duplicate orders,
+        # and Alpaca keys snapshots by the upper-case symbol.
+        self.symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols or ['BYND']))
+        self.short_window = 5   # Short-term moving average period
+        self.long_window = 20   # Long-term moving average period
+        self.position_size = 10  # Number of shares to trade per symbol
+        
         # Initialize Alpaca API (Paper Trading)
         self.api = REST(
             key_id=os.getenv('ALPACA_API_KEY'),
@@ -46,254 +154,669 @@ class SimpleMovingAverageBot:
             base_url='https://paper-api.alpaca.markets'  # Paper trading URL
         )
         
-        # Trading parameters
-        self.symbol = 'BYND'  # S&P 500 ETF - liquid and safe for testing
-        self.short_window = 5   # Short-term moving average period
-        self.long_window = 20   # Long-term moving average period
-        self.position_size = 10  # Number of shares to trade
+        # Keep a pool of persistent connections on the client's session so every
+        # call in a strategy cycle reuses the same TLS connection. The pool is
+        # sized for the bars and position requests of every symbol in flight at
+        # once. Idempotent requests are retried on transient gateway errors;
+        # orders are not. 429 and 504 are left to the client's own retry
+        # (APCA_RETRY_CODES) so the two layers don't multiply attempts.
+        self.api._session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(8, 2 * len(self.symbols) + 1),
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503],
+                raise_on_status=False
+            )
+        ))
+        
+        # Bar payloads are the bulk of what we download; parse them with orjson
+        self.api._session.hooks['response'].append(_orjson_response_hook)
+        
+        # Compile (or load the cached) signal kernel up front so the first
+        # strategy run doesn't pay for it
+        _signal_kernel()
+        
+        # Incremental MA state per symbol, kept between ticks. The last
+        # long_window closes of every symbol live in one contiguous float32
+        # array, one row per symbol, written as a ring at each row's count.
+        self._closes = np.zeros((len(self.symbols), self.long_window), dtype=np.float32)
+        self._state = {symbol: self._new_state(row) for row, symbol in enumerate(self.symbols)}
         
         # Timezone for market data (US markets)
         self.us_eastern = pytz.timezone('US/Eastern')
         
-        logger.info(f"Initialized trading bot for {self.symbol}")
-        logger.info(f"Using paper trading account: {self.api.get_account().account_number}")
+        # Short-lived API responses: {key: (expires_at, value)}
+        self._ttl_cache = {}
+        
+        logger.info("Initialized trading bot for %s", ', '.join(self.symbols))
+        account = self._cached('account', ACCOUNT_CACHE_SECONDS, self.api.get_account)
+        logger.info("Using paper trading account: %s", account.account_number)
+    
+    def _new_state(self, row):
+        """
+        Empty incremental MA state for one symbol: its row in self._closes, the
+        number of closes seen, running sums for both windows and the previous
+        signal. Seeded from minute bar history (or the bar stream) and then
+        updated in O(1).
+        """
+        return {
+            'row': row,
+            'count': 0,
+            'short_sum': 0.0,
+            'long_sum': 0.0,
+            'last_signal': None,
+            'last_bar_time': None  # Set once minute bars have seeded the state
+        }
     
     def _get_current_time(self):
         """Get current time in US/Eastern timezone to match market data"""
         return datetime.now(self.us_eastern)
     
-    def get_market_data(self):
-        """Fetch recent market data for analysis"""
+    def _days_old(self, latest):
+        """Whole days elapsed since a bar timestamp, using plain epoch arithmetic"""
+        return int((time.time() - latest.timestamp()) // 86400)
+    
+    def get_market_data(self, symbol):
+        """
+        Fetch recent market data for analysis.
+        
+        Returns (closes, days_old) where closes is a float64 array of bar closes
+        and days_old is the age of the last bar in whole days, or (None, None)
+        on failure.
+        """
+        from alpaca_trade_api import TimeFrame
+        
         try:
             end = self._get_current_time()
+            end_historical = end - timedelta(days=90)  # 3 months ago
             
-            # First try to get minute data for recent days (free accounts have limited access)
-            start = end - timedelta(days=5)
+            # Format every date boundary once; the fallback tiers below share them
+            end_date = end.strftime('%Y-%m-%d')
+            minute_start_date = (end - timedelta(days=5)).strftime('%Y-%m-%d')
+            daily_start_date = (end - timedelta(days=60)).strftime('%Y-%m-%d')
+            historical_end_date = end_historical.strftime('%Y-%m-%d')
+            historical_start_date = (end_historical - timedelta(days=60)).strftime('%Y-%m-%d')  # Additional 60 days back
             
+            # First try to get minute data for recent days (free accounts have limited access)
             try:
-                bars = self.api.get_bars(
-                    self.symbol,
+                closes, latest = self._fetch_closes(
+                    symbol,
                     TimeFrame.Minute,
-                    start=start.strftime('%Y-%m-%d'),
-                    end=end.strftime('%Y-%m-%d'),
+                    start=minute_start_date,
+                    end=end_date,
                     limit=1000
-                ).df
+                )
                 
-                if not bars.empty and len(bars) >= self.long_window:
-                    logger.info(f"Retrieved {len(bars)} minute bars for {self.symbol}")
-                    return bars
+                if len(closes) >= self.long_window:
+                    logger.info("Retrieved %s minute bars for %s", len(closes), symbol)
+                    # Only minute bars can be extended bar-by-bar on later ticks
+                    self._seed_state(self._state[symbol], closes, latest)
+                    return closes, self._days_old(latest)
                 else:
-                    logger.warning("Insufficient minute data, trying daily data...")
+                    logger.warning("Insufficient minute data for %s, trying daily data...", symbol)
                     
             except Exception as minute_error:
                 # Check if this is a subscription error
                 if "subscription" in str(minute_error).lower() or "sip" in str(minute_error).lower():
-                    logger.warning(f"Minute data unavailable (subscription does not permit querying recent SIP data), falling back to daily data")
+                    logger.warning("Minute data unavailable for %s (subscription does not permit querying recent SIP data), falling back to daily data", symbol)
                 else:
-                    logger.warning(f"Minute data unavailable ({minute_error}), falling back to daily data")
+                    logger.warning("Minute data unavailable for %s (%s), falling back to daily data", symbol, minute_error)
             
             # Try recent daily data first
-            start = end - timedelta(days=60)
-            
             try:
-                bars = self.api.get_bars(
-                    self.symbol,
+                closes, latest = self._fetch_closes(
+                    symbol,
                     TimeFrame.Day,
-                    start=start.strftime('%Y-%m-%d'),
-                    end=end.strftime('%Y-%m-%d'),
+                    start=daily_start_date,
+                    end=end_date,
                     limit=100
-                ).df
+                )
                 
-                if not bars.empty and len(bars) >= self.long_window:
-                    logger.info(f"Retrieved {len(bars)} daily bars for {self.symbol}")
-                    return bars
+                if len(closes) >= self.long_window:
+                    logger.info("Retrieved %s daily bars for %s", len(closes), symbol)
+                    return closes, self._days_old(latest)
                 else:
-                    logger.warning("Insufficient recent daily data, trying older historical data...")
+                    logger.warning("Insufficient recent daily data for %s, trying older historical data...", symbol)
                     
             except Exception as daily_error:
                 # Check if this is also a subscription error
                 if "subscription" in str(daily_error).lower() or "sip" in str(daily_error).lower():
-                    logger.warning(f"Recent daily data unavailable (subscription does not permit querying recent SIP data), falling back to older historical data")
+                    logger.warning("Recent daily data unavailable for %s (subscription does not permit querying recent SIP data), falling back to older historical data", symbol)
                 else:
-                    logger.warning(f"Recent daily data unavailable ({daily_error}), falling back to older historical data")
+                    logger.warning("Recent daily data unavailable for %s (%s), falling back to older historical data", symbol, daily_error)
             
             # Fallback to older historical data (typically available for free accounts)
             # Use data from 3-6 months ago which should be available without premium subscription
-            end_historical = end - timedelta(days=90)  # 3 months ago
-            start_historical = end_historical - timedelta(days=60)  # Additional 60 days back
-            
-            logger.info(f"Attempting to fetch historical data from {start_historical.strftime('%Y-%m-%d')} to {end_historical.strftime('%Y-%m-%d')}")
-            
-            bars = self.api.get_bars(
-                self.symbol,
+            closes, latest = self._get_cached_closes(
+                symbol,
                 TimeFrame.Day,
-                start=start_historical.strftime('%Y-%m-%d'),
-                end=end_historical.strftime('%Y-%m-%d'),
+                start=historical_start_date,
+                end=historical_end_date,
                 limit=100
-            ).df
+            )
             
-            if bars.empty:
-                logger.error("No historical market data received - unable to proceed")
-                return None
+            if len(closes) == 0:
+                logger.error("No historical market data received for %s - unable to proceed", symbol)
+                return None, None
                 
-            logger.info(f"Retrieved {len(bars)} historical daily bars for {self.symbol}")
+            logger.info("Retrieved %s historical daily bars for %s", len(closes), symbol)
             logger.info("Note: Using historical data due to subscription limitations with recent SIP data")
-            return bars
+            return closes, self._days_old(latest)
             
         except Exception as e:
-            logger.error(f"Error fetching market data: {e}")
-            return None
+            logger.error("Error fetching market data for %s: %s", symbol, e)
+            return None, None
+    
+    def _fetch_closes(self, symbol, timeframe, start, end, limit):
+        """Fetch bar closes and the last bar's timestamp without building a DataFrame"""
+        import numpy as np
+        
+        bars = list(self.api.get_bars_iter(
+            symbol,
+            timeframe,
+            start=start,
+            end=end,
+            limit=limit,
+            raw=True
+        ))
+        
+        # Only the close is used, so skip the OHLCV DataFrame entirely. Closes
+        # are rounded to the float32 precision of the incremental ring so the
+        # kernel and the seeded state compare exactly the same values.
+        closes = np.fromiter((bar['c'] for bar in bars), dtype=np.float32, count=len(bars)).astype(np.float64)
+        latest = _parse_bar_time(bars[-1]['t']) if bars else None
+        return closes, latest
     
-    def calculate_signals(self, data):
+    def _get_cached_closes(self, symbol, timeframe, start, end, limit):
+        """Fetch closes for a fixed date range, reusing a recent on-disk copy"""
+        import numpy as np
+        
+        # Plain arrays only (no pickle): the directory is restored from the CI
+        # cache, so loading it must not be able to run code
+        cache_path = os.path.join(BARS_CACHE_DIR, f"{symbol}_{timeframe}_{start}_{end}.npz")
+        
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) > time.time() - BARS_CACHE_SECONDS:
+            try:
+                with np.load(cache_path, allow_pickle=False) as cached:
+                    closes = cached['closes']
+                    latest = datetime.fromtimestamp(float(cached['latest']), tz=timezone.utc)
+                logger.info("Loaded cached bars from %s", cache_path)
+                return closes, latest
+            except Exception as e:
+                logger.warning("Ignoring unreadable bar cache %s: %s", cache_path, e)
+        
+        logger.info("Attempting to fetch historical data for %s from %s to %s", symbol, start, end)
+        closes, latest = self._fetch_closes(symbol, timeframe, start, end, limit)
+        
+        if len(closes) > 0:
+            os.makedirs(BARS_CACHE_DIR, exist_ok=True)
+            np.savez(cache_path, closes=closes, latest=latest.timestamp())
+        return closes, latest
+    
+    def calculate_signals(self, symbol, closes, days_old):
         """Calculate moving averages and trading signals"""
-        if data is None or len(data) < self.long_window:
-            logger.warning("Insufficient data for signal calculation")
+        if closes is None or len(closes) < self.long_window:
+            logger.warning("Insufficient data for %s signal calculation", symbol)
             return None, None, None
         
         # Check if we're using historical data (more than 30 days old)
-        latest_date = pd.to_datetime(data.index[-1])
-        current_time = self._get_current_time()
-        days_old = (current_time - latest_date).days
         if days_old > 30:
-            logger.info(f"Using historical data from {latest_date.strftime('%Y-%m-%d')} ({days_old} days old)")
+            logger.info("[%s] Using historical data (%s days old)", symbol, days_old)
             logger.info("Note: Signals are based on historical data due to subscription limitations")
         
-        # Calculate moving averages
-        data['short_ma'] = data['close'].rolling(window=self.short_window).mean()
-        data['long_ma'] = data['close'].rolling(window=self.long_window).mean()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] Data age: %s days", symbol, days_old)
+            logger.info("[%s] Historical price: $%.2f", symbol, closes[-1])
         
-        # Calculate signal (1 = buy, -1 = sell, 0 = hold)
-        data['signal'] = 0
-        data.iloc[self.short_window:, data.columns.get_loc('signal')] = np.where(
-            data['short_ma'].iloc[self.short_window:] > data['long_ma'].iloc[self.short_window:], 1, -1
+        return self._signals_from_closes(symbol, closes)
+    
+    def _signals_from_closes(self, symbol, closes):
+        """Run the crossover kernel over an array of closes and log the result"""
+        # Moving averages, signal (1 = buy, -1 = sell, 0 = hold) and crossover
+        # detection are computed in one compiled call over the latest closes
+        current_signal, current_position, current_price, short_ma, long_ma = _signal_kernel()(
+            closes, self.short_window, self.long_window
         )
         
-        # Detect crossover points
-        data['position'] = data['signal'].diff()
+        self._log_signals(symbol, short_ma, long_ma, current_signal, current_position)
+        
+        return current_signal, current_position, current_price
+    
+    def _log_signals(self, symbol, short_ma, long_ma, signal, position_change):
+        """Log the moving averages and signal for the latest bar"""
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] Short MA: $%.2f", symbol, short_ma)
+            logger.info("[%s] Long MA: $%.2f", symbol, long_ma)
+            logger.info("[%s] Signal: %s, Position change: %s", symbol, signal, position_change)
+    
+    def _push_close(self, state, close):
+        """
+        Add one close to a symbol's incremental MA state in O(1).
         
-        current_signal = data['signal'].iloc[-1]
-        current_position = data['position'].iloc[-1]
-        current_price = data['close'].iloc[-1]
+        Returns (signal, position change, short MA, long MA), or None until
+        long_window + 1 closes have been seen (the first crossover needs a
+        previous signal to compare against).
+        """
+        ring = self._closes[state['row']]
+        count = state['count']
+        if count >= self.long_window:
+            state['long_sum'] -= float(ring[count % self.long_window])
+        if count >= self.short_window:
+            state['short_sum'] -= float(ring[(count - self.short_window) % self.long_window])
         
-        logger.info(f"Data date: {latest_date.strftime('%Y-%m-%d')}")
-        logger.info(f"Historical price: ${current_price:.2f}")
-        logger.info(f"Short MA: ${data['short_ma'].iloc[-1]:.2f}")
-        logger.info(f"Long MA: ${data['long_ma'].iloc[-1]:.2f}")
-        logger.info(f"Signal: {current_signal}, Position change: {current_position}")
+        # Add the close as stored, so the float64 sums subtract exactly what
+        # they added once it leaves the window
+        ring[count % self.long_window] = close
+        close = float(ring[count % self.long_window])
+        state['count'] = count + 1
+        state['short_sum'] += close
+        state['long_sum'] += close
         
-        return current_signal, current_position, current_price
+        if count + 1 < self.long_window:
+            return None
+        
+        short_ma = state['short_sum'] / self.short_window
+        long_ma = state['long_sum'] / self.long_window
+        # Same tie-tolerant comparison as _compute_signals
+        signal = 2 * int(
+            state['short_sum'] * self.long_window - state['long_sum'] * self.short_window
+            > MA_TIE_TOLERANCE * self.short_window * state['long_sum']
+        ) - 1
+        prev_signal, state['last_signal'] = state['last_signal'], signal
+        if prev_signal is None:
+            return None
+        return signal, signal - prev_signal, short_ma, long_ma
+    
+    def _push_closes(self, state, closes):
+        """
+        Add a batch of closes to a symbol's incremental MA state.
+        
+        The position change is measured against the signal from before the
+        batch, so a crossover inside it is not lost when later bars in the
+        same batch keep the new signal. Returns (signal, position change,
+        short MA, long MA), or None while the state is still warming up.
+        """
+        signal_before = state['last_signal'] or 0  # No signal yet counts as 0
+        for close in closes:
+            self._push_close(state, float(close))
+        
+        signal = state['last_signal']
+        if signal is None:
+            return None
+        return (
+            signal,
+            signal - signal_before,
+            state['short_sum'] / self.short_window,
+            state['long_sum'] / self.long_window
+        )
+    
+    def _seed_state(self, state, closes, latest):
+        """Rebuild a symbol's incremental MA state from the tail of a bar history"""
+        state.update(self._new_state(state['row']))
+        for close in closes[-(self.long_window + 1):]:
+            self._push_close(state, float(close))
+        state['last_bar_time'] = latest
     
-    def get_current_position(self):
+    def get_tick_signals(self, symbol):
+        """
+        Signals for the current strategy tick.
+        
+        The first tick downloads bar history as before. Once minute bars have
+        seeded the incremental state, later ticks in the same process only
+        fetch bars newer than the last one seen (normally a single bar).
+        Returns (signal, position change, price, data age in days) or None.
+        """
+        state = self._state[symbol]
+        if state['last_bar_time'] is None:
+            closes, days_old = self.get_market_data(symbol)
+            signal, position_change, current_price = self.calculate_signals(symbol, closes, days_old)
+            if signal is None:
+                return None
+            return signal, position_change, current_price, days_old
+        
+        import numpy as np
+        from alpaca_trade_api import TimeFrame
+        
+        # Bars come back oldest first, so keep paging until a short page shows
+        # we have caught up; otherwise a long gap would leave the state behind
+        pages = []
+        latest = state['last_bar_time']
+        try:
+            while True:
+                page, page_latest = self._fetch_closes(
+                    symbol,
+                    TimeFrame.Minute,
+                    start=(latest + timedelta(seconds=1)).isoformat(),
+                    end=None,
+                    limit=1000
+                )
+                if len(page) > 0:
+                    pages.append(page)
+                    latest = page_latest
+                if len(page) < 1000:
+                    break
+        except Exception as e:
+            logger.warning("Incremental bar update for %s failed (%s), refetching bar history", symbol, e)
+            state['last_bar_time'] = None
+            return self.get_tick_signals(symbol)
+        
+        closes = np.concatenate(pages) if pages else np.empty(0)
+        if len(closes) == 0:
+            # Nothing new: the last crossover has already been acted on
+            logger.info("[%s] No new bars since %s", symbol, state['last_bar_time'])
+            last_close = float(self._closes[state['row'], (state['count'] - 1) % self.long_window])
+            return state['last_signal'], 0, last_close, self._days_old(state['last_bar_time'])
+        
+        result = self._push_closes(state, closes)
+        state['last_bar_time'] = latest
+        if result is None:
+            logger.info("[%s] Still warming up after %s new bars", symbol, len(closes))
+            return None
+        
+        signal, position_change, short_ma, long_ma = result
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Retrieved %s new minute bars for %s", len(closes), symbol)
+            logger.info("[%s] Latest price: $%.2f", symbol, closes[-1])
+        self._log_signals(symbol, short_ma, long_ma, signal, position_change)
+        return signal, position_change, closes[-1], self._days_old(latest)
+    
+    def get_snapshot_ticks(self):
+        """
+        Signals for every symbol from a single snapshots request.
+        
+        Once minute bars have seeded each symbol's incremental state, one call
+        returns the latest minute bar and trade for all symbols. The minute
+        bar updates the moving averages and the latest trade is the price. A
+        symbol without a usable snapshot, or whose minute bar isn't the one
+        right after the last bar seen, catches up through get_tick_signals.
+        Returns one tick (or None) per symbol, in the order of self.symbols.
+        """
+        try:
+            snapshots = self.api.get_snapshots(self.symbols)
+        except Exception as e:
+            logger.warning("Snapshot request failed (%s), fetching new bars per symbol", e)
+            snapshots = {}
+        
+        return [self._tick_from_snapshot(symbol, snapshots.get(symbol)) for symbol in self.symbols]
+    
+    def _tick_from_snapshot(self, symbol, snapshot):
+        """Advance one symbol's incremental state from its snapshot"""
+        if snapshot is None or snapshot.minute_bar is None or snapshot.latest_trade is None:
+            return self.get_tick_signals(symbol)
+        
+        state = self._state[symbol]
+        bar_time = snapshot.minute_bar.t.to_pydatetime()
+        current_price = snapshot.latest_trade.p
+        
+        if bar_time == state['last_bar_time']:
+            # Nothing new: the last crossover has already been acted on
+            logger.info("[%s] No new bars since %s", symbol, bar_time)
+            logger.info("[%s] Latest price: $%.2f", symbol, current_price)
+            return state['last_signal'], 0, current_price, self._days_old(bar_time)
+        if bar_time - state['last_bar_time'] != timedelta(minutes=1):
+            # Bars were missed between ticks, so fetch all of them
+            return self.get_tick_signals(symbol)
+        
+        result = self._push_closes(state, (snapshot.minute_bar.c,))
+        state['last_bar_time'] = bar_time
+        if result is None:
+            return None
+        
+        signal, position_change, short_ma, long_ma = result
+        
+        logger.info("[%s] Latest price: $%.2f", symbol, current_price)
+        self._log_signals(symbol, short_ma, long_ma, signal, position_change)
+        return signal, position_change, current_price, self._days_old(bar_time)
+    
+    def _cached(self, key, ttl, fetch):
+        """Return fetch() for key, reusing the previous result for ttl seconds"""
+        now = time.monotonic()
+        entry = self._ttl_cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = fetch()
+        self._ttl_cache[key] = (now + ttl, value)
+        return value
+    
+    def _fetch_position(self, symbol):
+        """Position quantity in a symbol"""
+        from alpaca_trade_api.rest import APIError
+        
+        # Ask for the one symbol rather than listing the whole portfolio
+        try:
+            return int(self.api.get_position(symbol).qty)
+        except APIError as e:
+            if e.status_code == 404 or 'position does not exist' in str(e).lower():
+                return 0
+            raise
+    
+    def get_current_position(self, symbol):
         """Get current position in the symbol"""
         try:
-            positions = self.api.list_positions()
-            for position in positions:
-                if position.symbol == self.symbol:
-                    return int(position.qty)
-            return 0
+            return self._cached(
+                ('position', symbol),
+                POSITION_CACHE_SECONDS,
+                lambda: self._fetch_position(symbol)
+            )
         except Exception as e:
-            logger.error(f"Error getting current position: {e}")
+            logger.error("Error getting current position in %s: %s", symbol, e)
             return 0
     
-    def place_order(self, side, qty):
+    def place_order(self, symbol, side, qty):
         """Place a market order"""
         try:
             order = self.api.submit_order(
-                symbol=self.symbol,
+                symbol=symbol,
                 qty=qty,
                 side=side,
                 type='market',
                 time_in_force='day'
             )
-            logger.info(f"Order placed: {side} {qty} shares of {self.symbol}")
-            logger.info(f"Order ID: {order.id}")
+            logger.info("Order placed: %s %s shares of %s", side, qty, symbol)
+            logger.info("Order ID: %s", order.id)
+            
+            # Our own order is what changes positions and account balances
+            self._ttl_cache.pop(('position', symbol), None)
+            self._ttl_cache.pop('account', None)
             return order
         except Exception as e:
-            logger.error(f"Error placing order: {e}")
+            logger.error("Error placing %s order for %s: %s", side, symbol, e)
             return None
     
     def is_market_open(self):
         """Check if market is currently open"""
         try:
-            clock = self.api.get_clock()
+            clock = self._cached('clock', CLOCK_CACHE_SECONDS, self.api.get_clock)
             return clock.is_open
         except Exception as e:
-            logger.error(f"Error checking market status: {e}")
+            logger.error("Error checking market status: %s", e)
             return False
     
-    def run_strategy(self):
+    async def run_strategy(self):
         """Main strategy execution"""
         logger.info("=" * 50)
         logger.info("Running trading strategy...")
         
+        # The market clock and each symbol's bars and position don't depend on
+        # each other, so issue all the blocking REST calls concurrently
+        if all(state['last_bar_time'] is not None for state in self._state.values()):
+            # Every symbol is seeded, so one snapshot request covers all bars
+            market_open, ticks, *positions = await asyncio.gather(
+                asyncio.to_thread(self.is_market_open),
+                asyncio.to_thread(self.get_snapshot_ticks),
+                *(asyncio.to_thread(self.get_current_position, symbol) for symbol in self.symbols)
+            )
+            results = zip(ticks, positions)
+        else:
+            market_open, *results = await asyncio.gather(
+                asyncio.to_thread(self.is_market_open),
+                *(self._fetch_symbol(symbol) for symbol in self.symbols)
+            )
+        
         # Check if market is open
-        if not self.is_market_open():
+        if not market_open:
             logger.info("Market is closed. No trading.")
             return
         
-        # Get market data
-        data = self.get_market_data()
-        if data is None:
-            return
+        # Orders depend on each symbol's signal, so they are placed afterwards
+        for symbol, (tick, current_qty) in zip(self.symbols, results):
+            self._trade_symbol(symbol, tick, current_qty)
         
-        # Calculate signals
-        signal, position_change, current_price = self.calculate_signals(data)
-        if signal is None:
+        self.log_account_status()
+    
+    async def _fetch_symbol(self, symbol):
+        """Fetch one symbol's signals and current position concurrently"""
+        return await asyncio.gather(
+            asyncio.to_thread(self.get_tick_signals, symbol),
+            asyncio.to_thread(self.get_current_position, symbol)
+        )
+    
+    def _trade_symbol(self, symbol, tick, current_qty):
+        """Trade one symbol on its latest signals unless the data is stale"""
+        # Check market data and signals
+        if tick is None:
             return
+        signal, position_change, current_price, days_old = tick
         
-        # Check if we're using historical data (more than 30 days old)
-        latest_date = pd.to_datetime(data.index[-1])
-        current_time = self._get_current_time()
-        days_old = (current_time - latest_date).days
-        
-        # Get current position
-        current_qty = self.get_current_position()
-        logger.info(f"Current position: {current_qty} shares")
+        logger.info("[%s] Current position: %s shares", symbol, current_qty)
         
         # Skip trading if using very old historical data
         if days_old > 30:
-            logger.info(f"Skipping trading - using historical data from {days_old} days ago")
+            logger.info("[%s] Skipping trading - using historical data from %s days ago", symbol, days_old)
             logger.info("Trading signals are for educational/testing purposes only when using historical data")
         else:
-            # Execute trades based on signals
-            if position_change == 2:  # Signal changed from -1 to 1 (buy signal)
-                if current_qty <= 0:  # Not already long
-                    # Close any short position first
-                    if current_qty < 0:
-                        self.place_order('buy', abs(current_qty))
-                    # Open long position
-                    self.place_order('buy', self.position_size)
-                    logger.info("BUY signal executed")
-                    
-            elif position_change == -2:  # Signal changed from 1 to -1 (sell signal)
-                if current_qty >= 0:  # Not already short
-                    # Close any long position first
-                    if current_qty > 0:
-                        self.place_order('sell', current_qty)
-                    # Open short position (only if allowed by your broker)
-                    # Note: For safety, we'll just close positions instead of shorting
-                    logger.info("SELL signal executed (position closed)")
-            
-            elif current_qty == 0:  # No position held - check if we should enter
-                if signal == 1:  # Buy signal and no position
-                    self.place_order('buy', self.position_size)
-                    logger.info("Initial BUY position opened based on current signal")
-                elif signal == -1:  # Sell signal and no position (skip for safety)
-                    logger.info("SELL signal detected but skipping initial short position for safety")
-            
-            else:
-                logger.info("No trading signal - holding current position")
+            self.execute_trades(symbol, signal, position_change, current_qty)
+    
+    async def run_polling(self, interval):
+        """Run the strategy every interval seconds, keeping MA state between ticks"""
+        while True:
+            await self.run_strategy()
+            await asyncio.sleep(interval)
+    
+    def execute_trades(self, symbol, signal, position_change, current_qty):
+        """Place orders for the latest signal given the current position"""
+        if position_change == 2:  # Signal changed from -1 to 1 (buy signal)
+            if current_qty <= 0:  # Not already long
+                # Close any short position first
+                if current_qty < 0:
+                    self.place_order(symbol, 'buy', abs(current_qty))
+                # Open long position
+                self.place_order(symbol, 'buy', self.position_size)
+                logger.info("[%s] BUY signal executed", symbol)
+                
+        elif position_change == -2:  # Signal changed from 1 to -1 (sell signal)
+            if current_qty >= 0:  # Not already short
+                # Close any long position first
+                if current_qty > 0:
+                    self.place_order(symbol, 'sell', current_qty)
+                # Open short position (only if allowed by your broker)
+                # Note: For safety, we'll just close positions instead of shorting
+                logger.info("[%s] SELL signal executed (position closed)", symbol)
+        
+        elif current_qty == 0:  # No position held - check if we should enter
+            if signal == 1:  # Buy signal and no position
+                self.place_order(symbol, 'buy', self.position_size)
+                logger.info("[%s] Initial BUY position opened based on current signal", symbol)
+            elif signal == -1:  # Sell signal and no position (skip for safety)
+                logger.info("[%s] SELL signal detected but skipping initial short position for safety", symbol)
         
-        # Log account status
+        else:
+            logger.info("[%s] No trading signal - holding current position", symbol)
+    
+    def log_account_status(self):
+        """Log account equity and buying power"""
         try:
-            account = self.api.get_account()
-            logger.info(f"Account equity: ${float(account.equity):.2f}")
-            logger.info(f"Buying power: ${float(account.buying_power):.2f}")
+            account = self._cached('account', ACCOUNT_CACHE_SECONDS, self.api.get_account)
+            logger.info("Account equity: $%.2f", float(account.equity))
+            logger.info("Buying power: $%.2f", float(account.buying_power))
         except Exception as e:
-            logger.error(f"Error getting account info: {e}")
+            logger.error("Error getting account info: %s", e)
+    
+    def run_stream(self):
+        """
+        Long-running alternative to run_strategy.
+        
+        Subscribes once to the minute bar stream and keeps the latest closes in
+        memory, so each new bar is evaluated without re-downloading bar history.
+        """
+        from alpaca_trade_api import Stream
+        
+        stream = Stream(
+            key_id=os.getenv('ALPACA_API_KEY'),
+            secret_key=os.getenv('ALPACA_SECRET_KEY'),
+            base_url='https://paper-api.alpaca.markets',  # Paper trading URL
+            data_feed='iex'  # Real-time feed available to free accounts
+        )
+        stream.subscribe_bars(self._on_bar, *self.symbols)
+        
+        logger.info("Streaming minute bars for %s (warm-up: %s bars)", ', '.join(self.symbols), self.long_window + 1)
+        stream.run()
+    
+    async def _on_bar(self, bar):
+        """Update the MA state with a streamed bar and evaluate once warmed up"""
+        state = self._state[bar.symbol]
+        result = self._push_close(state, bar.close)
+        if result is None:
+            logger.info("[%s] Warming up: %s/%s bars received", bar.symbol, state['count'], self.long_window + 1)
+            return
+        
+        # REST calls block, so run them off the event loop serving the socket
+        await asyncio.to_thread(self._evaluate_stream, bar.symbol, result, bar.close)
+    
+    def _evaluate_stream(self, symbol, result, current_price):
+        """Trade on the signal computed from the streamed closes"""
+        logger.info("=" * 50)
+        logger.info("Evaluating streamed bar for %s...", symbol)
+        
+        if not self.is_market_open():
+            logger.info("Market is closed. No trading.")
+            return
+        
+        signal, position_change, short_ma, long_ma = result
+        logger.info("[%s] Latest price: $%.2f", symbol, current_price)
+        self._log_signals(symbol, short_ma, long_ma, signal, position_change)
+        
+        current_qty = self.get_current_position(symbol)
+        logger.info("[%s] Current position: %s shares", symbol, current_qty)
+        
+        self.execute_trades(symbol, signal, position_change, current_qty)
+        self.log_account_status()
+
+def _positive_int(value):
+    """argparse type for a whole number of seconds greater than zero"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive whole number of seconds, got {value!r}")
+    return number
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Alpaca paper trading bot")
+    parser.add_argument(
+        '--symbols',
+        nargs='+',
+        metavar='SYMBOL',
+        help="symbols to trade (default: BYND)"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--stream',
+        action='store_true',
+        help="keep running and evaluate the strategy on every streamed minute bar"
+    )
+    mode.add_argument(
+        '--interval',
+        type=_positive_int,
+        metavar='SECONDS',
+        help="keep running and repeat the strategy every SECONDS, fetching only new bars"
+    )
+    args = parser.parse_args()
+    
     logger.info("Starting Alpaca Paper Trading Bot")
     
     # Verify environment variables
@@ -302,11 +825,16 @@ def main():
         return
     
     try:
-        bot = SimpleMovingAverageBot()
-        bot.run_strategy()
+        bot = SimpleMovingAverageBot(args.symbols)
+        if args.stream:
+            bot.run_stream()
+        elif args.interval is not None:
+            asyncio.run(bot.run_polling(args.interval))
+        else:
+            asyncio.run(bot.run_strategy())
         logger.info("Strategy execution completed")
     except Exception as e:
-        logger.error(f"Bot execution failed: {e}")
+        logger.error("Bot execution failed: %s", e)
         raise
 
 if __name__ == "__main__":